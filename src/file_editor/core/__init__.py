@@ -14,6 +14,7 @@ from .seek_editor import LineIndexedFile, SeekEditor, SparseFileEditor
 from .stream_editor import (
     ContextAwareStreamEditor,
     StreamEditor,
+    copy_byte_range,
     stream_copy_with_transform,
 )
 
@@ -26,6 +27,7 @@ __all__ = [
     "StreamEditor",
     "ContextAwareStreamEditor",
     "stream_copy_with_transform",
+    "copy_byte_range",
     # Seek-based editing
     "SeekEditor",
     "LineIndexedFile",
@@ -1,13 +1,60 @@
 """Streaming file editor for memory-efficient sequential processing."""
+import codecs
+import io
 import itertools
 import logging
+import os
+import queue
+import re
+import threading
 from collections import deque
 from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, suppress
+from functools import lru_cache
 from pathlib import Path
+from re import Pattern
 from typing import Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Buffer size for sequential reads and writes; far fewer syscalls than the
+# default 8 KiB buffer on large files
+IO_BUFFER_SIZE = 1024 * 1024
+
+# Not available on macOS or Windows
+_posix_fadvise = getattr(os, "posix_fadvise", None)
+
+# Linux only; copies between files without passing through user space
+_copy_file_range = getattr(os, "copy_file_range", None)
+
+# Ranges smaller than this are cheaper to copy through the buffers than to
+# flush the destination and make extra syscalls for
+_KERNEL_COPY_MIN = 64 * 1024
+
+# Marks the end of a prefetched chunk stream
+_END_OF_STREAM = object()
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: str, flags: int = 0) -> Pattern:
+    """Compile a regex, reusing earlier compilations of the same pattern."""
+    return re.compile(pattern, flags)
+
+
+def _advise(f, advice: str) -> None:
+    """Hint the kernel about how an open file will be accessed.
+
+    Args:
+        f: Open file object
+        advice: POSIX_FADV_* suffix, e.g. "SEQUENTIAL" or "RANDOM"
+    """
+    if _posix_fadvise is None:
+        return
+    # Purely advisory; some filesystems reject it
+    with suppress(OSError):
+        _posix_fadvise(f.fileno(), 0, 0, getattr(os, f"POSIX_FADV_{advice}"))
+
 
 class StreamEditor:
     """Streaming file editor for memory-efficient sequential processing.
@@ -20,6 +67,9 @@ class StreamEditor:
     - Line-by-line or chunk-based transformations
     """
 
+    # Used to decode text chunks; format editors set their own per instance
+    encoding = "utf-8"
+
     def __init__(self, file_path: Union[str, Path], chunk_size: int = 8192):
         """Initialize streaming editor.
 
@@ -33,19 +83,109 @@ class StreamEditor:
     def read_chunks(self, binary: bool = True) -> Iterator[Union[bytes, str]]:
         """Read file in chunks.
 
+        Text chunks keep the file's line endings exactly; unlike read_lines,
+        no universal-newline translation is applied. Write them to a text
+        file opened with newline="" to reproduce the original bytes.
+
         Args:
             binary: Whether to read in binary mode
 
         Yields:
             Chunks of file content
         """
-        mode = "rb" if binary else "r"
-        with open(self.file_path, mode) as f:
+        with open(self.file_path, "rb", buffering=IO_BUFFER_SIZE) as f:
+            _advise(f, "SEQUENTIAL")
+            yield from self._iter_chunks(f, binary)
+
+    def _iter_chunks(self, f, binary: bool) -> Iterator[Union[bytes, str]]:
+        """Yield chunk_size chunks from an open binary file.
+
+        Text chunks are decoded from large raw blocks with one incremental
+        decoder and then cut into chunk_size character windows.
+        """
+        if binary:
             while True:
                 chunk = f.read(self.chunk_size)
                 if not chunk:
                     break
                 yield chunk
+            return
+
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        chunk_size = self.chunk_size
+        block_size = max(chunk_size * 4, 65536)
+        text_buf = ""
+        offset = 0
+
+        while True:
+            raw = f.read(block_size)
+            # Drop consumed text once per block; trimming after every chunk
+            # would copy the rest of the buffer each time
+            text_buf = text_buf[offset:] + decoder.decode(raw, final=not raw)
+            offset = 0
+            while len(text_buf) - offset >= chunk_size:
+                yield text_buf[offset : offset + chunk_size]
+                offset += chunk_size
+            if not raw:
+                break
+
+        if offset < len(text_buf):
+            yield text_buf[offset:]
+
+    def read_chunks_prefetched(
+        self, binary: bool = True, prefetch: int = 2
+    ) -> Iterator[Union[bytes, str]]:
+        """Read file in chunks, reading ahead on a background thread.
+
+        The next chunks are read while the caller is still working on the
+        current one, hiding I/O latency when per-chunk processing is costly.
+
+        Args:
+            binary: Whether to read in binary mode
+            prefetch: Maximum number of chunks buffered ahead of the consumer
+
+        Yields:
+            Chunks of file content
+        """
+        buffer: queue.Queue = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+
+        def put(item: object) -> None:
+            # Give up once the consumer has gone away so the thread can exit
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def reader(f) -> None:
+            try:
+                for chunk in self._iter_chunks(f, binary):
+                    if stop.is_set():
+                        break
+                    put(chunk)
+            except Exception as e:
+                put(e)
+            finally:
+                put(_END_OF_STREAM)
+
+        # Open in the caller's thread so open errors surface unchanged
+        with open(self.file_path, "rb", buffering=IO_BUFFER_SIZE) as f:
+            _advise(f, "SEQUENTIAL")
+            thread = threading.Thread(target=reader, args=(f,), daemon=True)
+            thread.start()
+            try:
+                while True:
+                    item = buffer.get()
+                    if item is _END_OF_STREAM:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+            finally:
+                stop.set()
+                thread.join()
 
     def read_lines(
         self, batch_size: Optional[int] = None
@@ -58,7 +198,10 @@ class StreamEditor:
         Yields:
             Individual lines or batches of lines
         """
-        with open(self.file_path) as f:
+        with open(
+            self.file_path, encoding=self.encoding, buffering=IO_BUFFER_SIZE
+        ) as f:
+            _advise(f, "SEQUENTIAL")
             if batch_size is None:
                 yield from f
             else:
@@ -89,9 +232,20 @@ class StreamEditor:
 
         output_path = Path(output_path)
         mode = "wb" if binary else "w"
-
-        with open(output_path, mode) as out:
-            for chunk in self.read_chunks(binary):
+        encoding = None if binary else self.encoding
+        # Text chunks keep the file's line endings; writing them untranslated
+        # stops "\r\n" turning into "\r\r\n" on Windows
+        newline = None if binary else ""
+
+        # Closing the reader stops its thread even if processor raises
+        with open(
+            output_path,
+            mode,
+            encoding=encoding,
+            newline=newline,
+            buffering=IO_BUFFER_SIZE,
+        ) as out, closing(self.read_chunks_prefetched(binary)) as chunks:
+            for chunk in chunks:
                 processed = processor(chunk)
                 if processed:
                     out.write(processed)
@@ -117,11 +271,16 @@ class StreamEditor:
 
         output_path = Path(output_path)
 
-        with open(output_path, "w") as out:
+        # Stream each processed line straight into a large write buffer rather
+        # than collecting the output in memory first
+        with open(
+            output_path, "w", encoding=self.encoding, buffering=IO_BUFFER_SIZE
+        ) as out:
+            write = out.write
             for line in self.read_lines():
                 processed = processor(line)
                 if processed is not None:
-                    out.write(processed)
+                    write(processed)
 
         return output_path
 
@@ -143,10 +302,88 @@ class StreamEditor:
             lambda line: line if predicate(line) else None, output_path
         )
 
+    def filter_lines_by_int_field(
+        self,
+        predicate: Callable[[int], bool],
+        field: int = 0,
+        sep: Optional[bytes] = None,
+        output_path: Optional[Union[str, Path]] = None,
+    ) -> Optional[Path]:
+        """Filter lines on the integer value of one of their fields.
+
+        Works on raw bytes, so lines are neither decoded nor re-encoded and
+        only the requested field is parsed. Lines where the field is missing
+        or not an integer are dropped.
+
+        Args:
+            predicate: Function to test the parsed field value
+            field: Index of the field to parse (0-based)
+            sep: Field separator (None splits on runs of whitespace)
+            output_path: Output file path
+
+        Returns:
+            Path to output file
+        """
+        if output_path is None:
+            output_path = self.file_path.with_suffix(".tmp")
+
+        output_path = Path(output_path)
+
+        with open(self.file_path, "rb", buffering=IO_BUFFER_SIZE) as src, open(
+            output_path, "wb", buffering=IO_BUFFER_SIZE
+        ) as out:
+            _advise(src, "SEQUENTIAL")
+            write = out.write
+            for line in src:
+                try:
+                    value = int(line.split(sep, field + 1)[field])
+                except (IndexError, ValueError):
+                    continue
+                if predicate(value):
+                    write(line)
+
+        return output_path
+
     def count_lines(self) -> int:
-        """Count lines in file efficiently."""
+        """Count lines in file efficiently.
+
+        Counts newline bytes in large blocks instead of iterating lines; a
+        final line without a trailing newline is counted as well. Files that
+        a byte count would get wrong are counted by iterating read_lines:
+        encodings in which a newline is not the single byte 0x0A, and files
+        with carriage returns that are not part of a CRLF.
+        """
+        if "\n".encode(self.encoding) != b"\n":
+            return sum(1 for _ in self.read_lines())
+
         count = 0
-        for _ in self.read_lines():
+        last = b""
+        # A block ending in "\r" may be the first half of a CRLF
+        cr_pending = False
+        bare_cr = False
+
+        with open(self.file_path, "rb") as f:
+            _advise(f, "SEQUENTIAL")
+            while True:
+                block = f.read(IO_BUFFER_SIZE)
+                if not block:
+                    break
+                if cr_pending and not block.startswith(b"\n"):
+                    bare_cr = True
+                    break
+                cr_pending = block.endswith(b"\r")
+                if cr_pending or b"\r" in block:
+                    bare = block.count(b"\r") - block.count(b"\r\n") - cr_pending
+                    if bare:
+                        bare_cr = True
+                        break
+                count += block.count(b"\n")
+                last = block[-1:]
+
+        if bare_cr or cr_pending:
+            # read_lines treats a lone "\r" as a line break too
+            return sum(1 for _ in self.read_lines())
+        if last and last != b"\n":
             count += 1
         return count
 
@@ -160,8 +397,29 @@ class StreamEditor:
         return lines
 
     def tail(self, n: int = 10) -> list[str]:
-        """Get last n lines of file efficiently using deque."""
-        return list(deque((line.rstrip("\n") for line in self.read_lines()), maxlen=n))
+        """Get last n lines of file by reading backwards from the end."""
+        blocks = []
+        newlines = 0
+
+        with open(self.file_path, "rb") as f:
+            _advise(f, "RANDOM")
+            pos = f.seek(0, os.SEEK_END)
+            # One extra newline guarantees the first kept line is complete
+            while pos > 0 and newlines <= n:
+                step = min(self.chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                block = f.read(step)
+                blocks.append(block)
+                newlines += block.count(b"\n")
+
+        data = b"".join(reversed(blocks))
+        if pos > 0:
+            data = data[data.index(b"\n") + 1 :]
+
+        # Decode the same way read_lines does, including newline translation
+        text = io.TextIOWrapper(io.BytesIO(data), encoding=self.encoding)
+        return list(deque((line.rstrip("\n") for line in text), maxlen=n))
 
     def grep(
         self, pattern: str, case_sensitive: bool = True
@@ -175,12 +433,16 @@ class StreamEditor:
         Yields:
             Tuples of (line_number, line_content)
         """
-        if not case_sensitive:
-            pattern = pattern.lower()
-
+        if case_sensitive:
+            for line_num, line in enumerate(self.read_lines(), 1):
+                if pattern in line:
+                    yield (line_num, line.rstrip("\n"))
+            return
+
+        # Match case-insensitively in C instead of lowercasing every line
+        search = _compile(re.escape(pattern), re.IGNORECASE).search
         for line_num, line in enumerate(self.read_lines(), 1):
-            search_line = line if case_sensitive else line.lower()
-            if pattern in search_line:
+            if search(line):
                 yield (line_num, line.rstrip("\n"))
 
 
@@ -226,7 +488,9 @@ class ContextAwareStreamEditor(StreamEditor):
         context_buffer = deque(maxlen=self.context_lines)
         pending_lines = []
 
-        with open(output_path, "w") as out:
+        with open(
+            output_path, "w", encoding=self.encoding, buffering=IO_BUFFER_SIZE
+        ) as out:
             for line in self.read_lines():
                 if condition_func(line, context_buffer):
                     # Transform with context
@@ -266,6 +530,7 @@ def stream_copy_with_transform(
     dest = Path(dest)
 
     with open(source, "rb") as src, open(dest, "wb") as dst:
+        _advise(src, "SEQUENTIAL")
         while True:
             chunk = src.read(chunk_size)
             if not chunk:
@@ -273,40 +538,139 @@ def stream_copy_with_transform(
             dst.write(transform(chunk))
 
 
+def copy_byte_range(src, dst, start: int, end: int) -> None:
+    """Copy bytes [start, end) between open binary files in bounded blocks.
+
+    Large ranges are copied inside the kernel with copy_file_range where
+    available; whatever it cannot copy falls back to a read/write loop.
+
+    Args:
+        src: Source file opened for binary reading
+        dst: Destination file opened for binary writing
+        start: First byte to copy
+        end: Byte offset to stop at (exclusive)
+    """
+    remaining = end - start
+    if _copy_file_range is not None and remaining >= _KERNEL_COPY_MIN:
+        copied = _kernel_copy(src, dst, start, remaining)
+        start += copied
+        remaining -= copied
+
+    src.seek(start)
+    while remaining > 0:
+        block = src.read(min(IO_BUFFER_SIZE, remaining))
+        if not block:
+            break
+        dst.write(block)
+        remaining -= len(block)
+
+
+def _kernel_copy(src, dst, start: int, length: int) -> int:
+    """Copy up to length bytes from src at start to dst with copy_file_range.
+
+    Explicit offsets are used for both files and dst is repositioned after
+    the copy, so the buffered file objects stay consistent.
+
+    Returns:
+        Number of bytes copied, possibly 0 if the kernel refused the copy
+    """
+    try:
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return 0
+
+    dst.flush()
+    dst_start = dst.tell()
+    copied = 0
+    try:
+        while copied < length:
+            n = _copy_file_range(
+                src_fd, dst_fd, length - copied, start + copied, dst_start + copied
+            )
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        # e.g. unsupported filesystem or cross-device copy on older kernels
+        pass
+
+    dst.seek(dst_start + copied)
+    return copied
+
+
 def parallel_chunk_processor(
     file_path: Union[str, Path],
     processor: Callable[[int, bytes], bytes],
     chunk_size: int = 1024 * 1024,
     num_chunks: Optional[int] = None,
+    *,
+    max_workers: Optional[int] = None,
+    max_inflight: Optional[int] = None,
 ) -> Iterator[tuple[int, bytes]]:
     """Process file chunks with offset information.
 
     This generator allows for parallel-friendly processing by providing
-    chunk offset information along with the data.
+    chunk offset information along with the data. With max_workers set,
+    chunks are processed on a thread pool while results are still yielded
+    in file order; at most max_inflight chunks are read ahead, which caps
+    memory at roughly max_inflight * chunk_size.
 
     Args:
         file_path: Path to file
         processor: Function taking (offset, chunk) and returning processed chunk
         chunk_size: Size of each chunk
         num_chunks: Maximum number of chunks to process
+        max_workers: Number of worker threads (None processes in the caller)
+        max_inflight: Maximum chunks submitted but not yet yielded
+            (default 2 * max_workers)
 
     Yields:
         Tuples of (offset, processed_chunk)
     """
+    with open(file_path, "rb") as f:
+        _advise(f, "SEQUENTIAL")
+        chunks = _iter_offset_chunks(f, chunk_size, num_chunks)
+
+        if max_workers is None:
+            for offset, chunk in chunks:
+                yield (offset, processor(offset, chunk))
+            return
+
+        if max_inflight is None:
+            max_inflight = 2 * max_workers
+
+        pending: deque[tuple[int, Future]] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            try:
+                for offset, chunk in chunks:
+                    pending.append((offset, pool.submit(processor, offset, chunk)))
+                    if len(pending) >= max_inflight:
+                        done_offset, done = pending.popleft()
+                        yield (done_offset, done.result())
+
+                while pending:
+                    done_offset, done = pending.popleft()
+                    yield (done_offset, done.result())
+            finally:
+                # Don't run work nobody will consume if the caller stops early
+                for _, future in pending:
+                    future.cancel()
+
+
+def _iter_offset_chunks(
+    f, chunk_size: int, num_chunks: Optional[int]
+) -> Iterator[tuple[int, bytes]]:
+    """Yield (offset, chunk) pairs from an open binary file."""
     offset = 0
     chunks_processed = 0
 
-    with open(file_path, "rb") as f:
-        while True:
-            if num_chunks is not None and chunks_processed >= num_chunks:
-                break
-
-            chunk = f.read(chunk_size)
-            if not chunk:
-                break
+    while num_chunks is None or chunks_processed < num_chunks:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
 
-            processed = processor(offset, chunk)
-            yield (offset, processed)
+        yield (offset, chunk)
 
-            offset += len(chunk)
-            chunks_processed += 1
+        offset += len(chunk)
+        chunks_processed += 1
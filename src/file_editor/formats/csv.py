@@ -1,6 +1,10 @@
 """CSV file editing with efficient chunk processing."""
 import csv
+import heapq
 import logging
+import math
+import operator
+from array import array
 from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any, Optional, Union
@@ -10,6 +14,14 @@ from ..core.stream_editor import StreamEditor
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
 try:
     import pandas as pd
 
@@ -18,6 +30,16 @@ except ImportError:
     HAS_PANDAS = False
     pd = None
 
+# Comparison operators accepted by CSVEditor.count_where
+_COMPARISONS: dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
 
 class CSVEditor(StreamEditor):
     """CSV file editor with efficient row-wise processing.
@@ -81,54 +103,104 @@ class CSVEditor(StreamEditor):
             Dictionary with column headers as keys
         """
         with open(self.file_path, encoding=self.encoding) as f:
-            reader = csv.DictReader(
-                f, delimiter=self.delimiter, quotechar=self.quotechar
-            )
-            yield from reader
-
-    def process_rows(
+            reader = csv.reader(f, delimiter=self.delimiter, quotechar=self.quotechar)
+            headers = next(reader, None)
+            if headers is None:
+                return
+
+            width = len(headers)
+            for row in reader:
+                if len(row) == width and row:
+                    yield dict(zip(headers, row, strict=True))
+                elif row:
+                    # Ragged rows follow csv.DictReader: missing fields are
+                    # None and extra fields are collected under the None key
+                    row_dict = dict(zip(headers, row, strict=False))
+                    if len(row) > width:
+                        row_dict[None] = row[width:]
+                    else:
+                        for header in headers[len(row) :]:
+                            row_dict[header] = None
+                    yield row_dict
+
+    def transform(
         self,
-        row_transformer: Callable[[dict[str, str]], Optional[dict[str, str]]],
+        *,
+        updates: Optional[dict[str, Callable[[str], str]]] = None,
+        additions: Optional[dict[str, Callable[[dict[str, str]], str]]] = None,
+        row_fn: Optional[Callable[[dict[str, str]], Optional[dict[str, str]]]] = None,
         output_path: Optional[Union[str, Path]] = None,
     ) -> Optional[Path]:
-        """Process CSV rows with a transformation function.
+        """Apply row, column and new-column transformations in a single pass.
+
+        Each row is parsed and written once no matter how many transformations
+        are combined. For every row, row_fn runs first (returning None drops
+        the row), then the column updates, then the additions, which see the
+        updated row and are appended as new columns in the given order.
 
         Args:
-            row_transformer: Function to transform each row (return None to skip)
+            updates: Mapping of column name to a function of the column value
+            additions: Mapping of new column name to a function of the row
+            row_fn: Function to transform each row (return None to skip)
             output_path: Output file path
 
         Returns:
-            Path to output file
+            Path to transformed CSV file
         """
         if output_path is None:
             output_path = self.file_path.with_suffix(".tmp")
 
         output_path = Path(output_path)
-        headers = self.get_headers()
+        updates = updates or {}
+        additions = additions or {}
+        fieldnames = self.get_headers() + list(additions)
 
         try:
             with open(output_path, "w", newline="", encoding=self.encoding) as outfile:
                 writer = csv.DictWriter(
                     outfile,
-                    fieldnames=headers,
+                    fieldnames=fieldnames,
                     delimiter=self.delimiter,
                     quotechar=self.quotechar,
                 )
                 writer.writeheader()
 
                 for row in self.read_dict_rows():
-                    transformed_row = row_transformer(row)
-                    if transformed_row is not None:
-                        writer.writerow(transformed_row)
+                    if row_fn is not None:
+                        row = row_fn(row)
+                        if row is None:
+                            continue
+                    for column_name, value_func in updates.items():
+                        if column_name in row:
+                            row[column_name] = value_func(row[column_name])
+                    for column_name, value_func in additions.items():
+                        row[column_name] = value_func(row)
+                    writer.writerow(row)
 
             return output_path
 
         except Exception as e:
-            logger.error(f"Failed to process CSV rows: {e}")
+            logger.error(f"Failed to transform CSV rows: {e}")
             if output_path.exists():
                 output_path.unlink()
             return None
 
+    def process_rows(
+        self,
+        row_transformer: Callable[[dict[str, str]], Optional[dict[str, str]]],
+        output_path: Optional[Union[str, Path]] = None,
+    ) -> Optional[Path]:
+        """Process CSV rows with a transformation function.
+
+        Args:
+            row_transformer: Function to transform each row (return None to skip)
+            output_path: Output file path
+
+        Returns:
+            Path to output file
+        """
+        return self.transform(row_fn=row_transformer, output_path=output_path)
+
     def filter_rows(
         self,
         predicate: Callable[[dict[str, str]], bool],
@@ -163,13 +235,9 @@ class CSVEditor(StreamEditor):
         Returns:
             Path to updated CSV file
         """
-
-        def transform_row(row: dict[str, str]) -> dict[str, str]:
-            if column_name in row:
-                row[column_name] = value_func(row[column_name])
-            return row
-
-        return self.process_rows(transform_row, output_path)
+        return self.transform(
+            updates={column_name: value_func}, output_path=output_path
+        )
 
     def add_column(
         self,
@@ -187,66 +255,53 @@ class CSVEditor(StreamEditor):
         Returns:
             Path to updated CSV file
         """
-        if output_path is None:
-            output_path = self.file_path.with_suffix(".tmp")
-
-        output_path = Path(output_path)
-        headers = self.get_headers()
-        new_headers = headers + [column_name]
-
-        try:
-            with open(output_path, "w", newline="", encoding=self.encoding) as outfile:
-                writer = csv.DictWriter(
-                    outfile,
-                    fieldnames=new_headers,
-                    delimiter=self.delimiter,
-                    quotechar=self.quotechar,
-                )
-                writer.writeheader()
-
-                for row in self.read_dict_rows():
-                    row[column_name] = value_func(row)
-                    writer.writerow(row)
-
-            return output_path
-
-        except Exception as e:
-            logger.error(f"Failed to add CSV column: {e}")
-            if output_path.exists():
-                output_path.unlink()
-            return None
+        return self.transform(
+            additions={column_name: value_func}, output_path=output_path
+        )
 
     def sort_by_column(
         self,
         column_name: str,
         reverse: bool = False,
         key_func: Optional[Callable[[str], Any]] = None,
+        limit: Optional[int] = None,
     ) -> bool:
         """Sort CSV by a specific column.
 
-        Note: This loads all data into memory for sorting.
+        Note: This loads all data into memory for sorting, unless limit is
+        given, in which case only the top rows are held.
 
         Args:
             column_name: Column to sort by
             reverse: Sort in descending order
             key_func: Optional function to transform sort key
+            limit: Keep only the first limit rows of the sorted result
 
         Returns:
             True if sorting was successful
         """
         try:
-            rows = list(self.read_dict_rows())
             headers = self.get_headers()
 
             if column_name not in headers:
                 logger.error(f"Column '{column_name}' not found")
                 return False
 
-            # Sort rows
-            sort_key = (
-                lambda row: key_func(row[column_name]) if key_func else row[column_name]
-            )
-            rows.sort(key=sort_key, reverse=reverse)
+            # Sort plain list rows; no per-row dict is needed to pick one field
+            index = headers.index(column_name)
+            if key_func:
+                sort_key = lambda row: key_func(row[index])
+            else:
+                sort_key = operator.itemgetter(index)
+
+            rows_iter = (row for row in self.read_rows() if row)
+            if limit is not None:
+                # Partial sort: O(n log k) and only k rows kept in memory
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                rows = select(max(limit, 0), rows_iter, key=sort_key)
+            else:
+                rows = list(rows_iter)
+                rows.sort(key=sort_key, reverse=reverse)
 
             # Write sorted data
             with safe_edit_context(self.file_path) as safe_op:
@@ -255,13 +310,12 @@ class CSVEditor(StreamEditor):
                 with open(
                     temp_file, "w", newline="", encoding=self.encoding
                 ) as outfile:
-                    writer = csv.DictWriter(
+                    writer = csv.writer(
                         outfile,
-                        fieldnames=headers,
                         delimiter=self.delimiter,
                         quotechar=self.quotechar,
                     )
-                    writer.writeheader()
+                    writer.writerow(headers)
                     writer.writerows(rows)
 
                 safe_op.atomic_replace(temp_file)
@@ -274,10 +328,65 @@ class CSVEditor(StreamEditor):
 
     def count_rows(self) -> int:
         """Count number of data rows (excluding header)."""
-        count = 0
-        for _ in self.read_rows(skip_header=True):
-            count += 1
-        return count
+        return sum(1 for _ in self.read_rows(skip_header=True))
+
+    def count_where(self, column_name: str, op: str, value: float) -> int:
+        """Count rows whose numeric column value compares true against value.
+
+        The column is read with a plain csv.reader, without building a dict
+        per row, and compared in one vectorized pass when NumPy is available.
+        Empty and non-numeric values never match.
+
+        Args:
+            column_name: Column to compare
+            op: Comparison operator, one of >, >=, <, <=, ==, !=
+            value: Value to compare against
+
+        Returns:
+            Number of matching rows
+        """
+        compare = _COMPARISONS.get(op)
+        if compare is None:
+            raise ValueError(f"Unsupported comparison operator: {op!r}")
+
+        column = self._read_column(column_name)
+        if column is None:
+            return 0
+        return _count_numeric_matches(column, compare, value)
+
+    def read_int_column(self, column_name: str) -> Union[array, "np.ndarray"]:
+        """Read a column of integers into a native int64 array.
+
+        Values are stored unboxed, as a NumPy array when available and an
+        array.array otherwise, so they can be compared or reduced in bulk.
+
+        Args:
+            column_name: Column to read
+
+        Returns:
+            Column values in row order; empty if the column does not exist
+
+        Raises:
+            ValueError: If a value is not an integer
+        """
+        column = self._read_column(column_name) or []
+        if HAS_NUMPY:
+            return np.array(column, dtype=np.int64)
+        return array("q", map(int, column))
+
+    def _read_column(self, column_name: str) -> Optional[list[str]]:
+        """Read one column's raw values, skipping rows too short to have it.
+
+        Returns:
+            Column values, or None if the column does not exist
+        """
+        headers = self.get_headers()
+        if column_name not in headers:
+            logger.error(f"Column '{column_name}' not found")
+            return None
+
+        index = headers.index(column_name)
+        return [row[index] for row in self.read_rows() if len(row) > index]
 
     def get_column_stats(self, column_name: str) -> dict[str, Any]:
         """Get basic statistics for a column.
@@ -288,11 +397,15 @@ class CSVEditor(StreamEditor):
         Returns:
             Dictionary with column statistics
         """
+        headers = self.get_headers()
+        index = headers.index(column_name) if column_name in headers else None
         values = []
         non_empty_values = []
 
-        for row in self.read_dict_rows():
-            value = row.get(column_name, "")
+        for row in self.read_rows():
+            if not row:
+                continue
+            value = row[index] if index is not None and index < len(row) else ""
             values.append(value)
             if value.strip():
                 non_empty_values.append(value)
@@ -306,45 +419,117 @@ class CSVEditor(StreamEditor):
 
         # Try to get numeric statistics
         try:
-            numeric_values = [
-                float(v)
+            numeric_strings = [
+                v
                 for v in non_empty_values
                 if v.replace(".", "").replace("-", "").isdigit()
             ]
-            if numeric_values:
-                stats.update(
-                    {
-                        "numeric_count": len(numeric_values),
-                        "min_value": min(numeric_values),
-                        "max_value": max(numeric_values),
-                        "avg_value": sum(numeric_values) / len(numeric_values),
-                    }
-                )
+            if numeric_strings:
+                stats.update(_numeric_stats(numeric_strings))
         except ValueError:
             pass
 
         return stats
 
 
+def _numeric_stats(numeric_strings: list[str]) -> dict[str, Any]:
+    """Compute count, min, max and mean of numeric strings.
+
+    Uses NumPy when available so parsing and reductions run in C.
+
+    Raises:
+        ValueError: If a value cannot be parsed as a float
+    """
+    if HAS_NUMPY:
+        try:
+            values = np.asarray(numeric_strings, dtype=np.float64)
+        except ValueError:
+            # NumPy rejects some digits float() accepts, e.g. non-ASCII ones
+            pass
+        else:
+            return {
+                "numeric_count": int(values.size),
+                "min_value": float(values.min()),
+                "max_value": float(values.max()),
+                "avg_value": float(values.mean()),
+            }
+
+    numeric_values = [float(v) for v in numeric_strings]
+    return {
+        "numeric_count": len(numeric_values),
+        "min_value": min(numeric_values),
+        "max_value": max(numeric_values),
+        "avg_value": sum(numeric_values) / len(numeric_values),
+    }
+
+
+def _count_numeric_matches(
+    column: list[str], compare: Callable[[Any, Any], Any], value: float
+) -> int:
+    """Count numeric strings for which compare(number, value) is true.
+
+    "nan" and "inf" parse as floats but are not numbers a comparison should
+    match, so non-finite values are skipped like unparsable ones.
+    """
+    if HAS_NUMPY:
+        try:
+            values = np.asarray(column, dtype=np.float64)
+        except ValueError:
+            # Empty or non-numeric values; skip them one by one below
+            pass
+        else:
+            matches = compare(values, value) & np.isfinite(values)
+            return int(np.count_nonzero(matches))
+
+    count = 0
+    for item in column:
+        try:
+            number = float(item)
+        except ValueError:
+            continue
+        if math.isfinite(number) and compare(number, value):
+            count += 1
+    return count
+
+
 if HAS_PANDAS:
 
     class PandasCSVEditor(CSVEditor):
         """CSV editor using pandas for advanced operations."""
 
         def __init__(
-            self, file_path: Union[str, Path], chunk_size: int = 10000, **pandas_kwargs
+            self,
+            file_path: Union[str, Path],
+            chunk_size: int = 10000,
+            dtype: Optional[Any] = None,
+            usecols: Optional[list[Union[str, int]]] = None,
+            **pandas_kwargs,
         ):
             """Initialize pandas CSV editor.
 
             Args:
                 file_path: Path to CSV file
                 chunk_size: Chunk size for processing
+                dtype: Column dtypes for pandas.read_csv; explicit numeric
+                    dtypes keep columns as native arrays instead of objects
+                usecols: Only parse these columns
                 **pandas_kwargs: Additional arguments for pandas.read_csv
             """
             super().__init__(file_path)
             self.chunk_size = chunk_size
+            self.dtype = dtype
+            self.usecols = usecols
             self.pandas_kwargs = pandas_kwargs
 
+        def _read_csv_kwargs(self) -> dict[str, Any]:
+            """Build keyword arguments for chunked pandas.read_csv."""
+            kwargs: dict[str, Any] = {"engine": "c", **self.pandas_kwargs}
+            if self.dtype is not None:
+                kwargs["dtype"] = self.dtype
+            if self.usecols is not None:
+                kwargs["usecols"] = self.usecols
+            return kwargs
+
         def process_chunks(
             self,
             chunk_processor: Callable[[pd.DataFrame], pd.DataFrame],
@@ -367,19 +552,22 @@ if HAS_PANDAS:
             try:
                 first_chunk = True
 
-                for chunk in pd.read_csv(
-                    self.file_path, chunksize=self.chunk_size, **self.pandas_kwargs
-                ):
-                    processed_chunk = chunk_processor(chunk)
-
-                    if processed_chunk is not None and not processed_chunk.empty:
-                        mode = "w" if first_chunk else "a"
-                        header = first_chunk
-
-                        processed_chunk.to_csv(
-                            output_path, mode=mode, header=header, index=False
-                        )
-                        first_chunk = False
+                # Keep one handle open rather than reopening the file per chunk
+                with open(
+                    output_path, "w", newline="", encoding=self.encoding
+                ) as outfile:
+                    for chunk in pd.read_csv(
+                        self.file_path,
+                        chunksize=self.chunk_size,
+                        **self._read_csv_kwargs(),
+                    ):
+                        processed_chunk = chunk_processor(chunk)
+
+                        if processed_chunk is not None and not processed_chunk.empty:
+                            processed_chunk.to_csv(
+                                outfile, header=first_chunk, index=False
+                            )
+                            first_chunk = False
 
                 return output_path
 
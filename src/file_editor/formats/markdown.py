@@ -1,14 +1,27 @@
 """Markdown-specific file editing with structure awareness."""
 import logging
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import NamedTuple, Optional, Union
 
 from ..core.safety import safe_edit_context
-from ..core.stream_editor import StreamEditor
+from ..core.stream_editor import IO_BUFFER_SIZE, StreamEditor, copy_byte_range
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import and shared by every editor instance. Multiline so
+# one finditer over the whole document finds every heading; the separator
+# excludes newlines so a match never spans two lines.
+_HEADING_PATTERN = re.compile(r"^(#{1,6})[^\S\n]+(.+)$", re.MULTILINE)
+_LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+
+
+@lru_cache(maxsize=1024)
+def _anchor(title: str) -> str:
+    """Build the link anchor for a heading title."""
+    return title.lower().replace(" ", "-").replace(".", "")
+
 
 class MarkdownSection(NamedTuple):
     """Represents a markdown section."""
@@ -20,6 +33,16 @@ class MarkdownSection(NamedTuple):
     content: str
 
 
+class _SectionSpan(NamedTuple):
+    """Byte offsets of a section within the file."""
+
+    start: int  # First byte of the heading line
+    body_start: int  # First byte after the heading line
+    end: int  # First byte of the next heading at the same or higher level
+    level: int
+    title: str
+
+
 class MarkdownEditor(StreamEditor):
     """Markdown file editor with structure awareness.
 
@@ -27,72 +50,89 @@ class MarkdownEditor(StreamEditor):
     specific sections without loading the entire document.
     """
 
-    def __init__(self, file_path: Union[str, Path]):
+    def __init__(self, file_path: Union[str, Path], encoding: str = "utf-8"):
         """Initialize markdown editor.
 
         Args:
             file_path: Path to the markdown file
+            encoding: File encoding
         """
         super().__init__(file_path)
-        self.heading_pattern = re.compile(r"^(#{1,6})\s+(.+)$")
+        self.encoding = encoding
+        self.heading_pattern = _HEADING_PATTERN
         self.sections: list[MarkdownSection] = []
+        # (mtime_ns, size) of the file the cached sections were parsed from
+        self._sections_key: Optional[tuple[int, int]] = None
+        self._toc: Optional[str] = None
+        self._toc_key: Optional[tuple[int, int]] = None
 
     def _parse_structure(self) -> list[MarkdownSection]:
-        """Parse markdown structure into sections."""
+        """Parse markdown structure into sections.
+
+        Runs a single regex scan over the document and slices section bodies
+        between heading matches, instead of matching every line in Python.
+        The file is decoded once here; callers go through get_sections,
+        which keeps the result until the file changes.
+        """
+        text = self.file_path.read_text(encoding=self.encoding)
+        matches = list(_HEADING_PATTERN.finditer(text))
+        if not matches:
+            return []
+
+        # 1-based line number of each heading, counted between matches
+        heading_lines = []
+        line_num = 1
+        pos = 0
+        for match in matches:
+            line_num += text.count("\n", pos, match.start())
+            pos = match.start()
+            heading_lines.append(line_num)
+
+        total_lines = text.count("\n") + (0 if text.endswith("\n") else 1)
+
         sections = []
-        current_section = None
-        content_lines = []
-
-        for line_num, line in enumerate(self.read_lines(), 1):
-            line = line.rstrip("\n")
-            heading_match = self.heading_pattern.match(line)
-
-            if heading_match:
-                # Save previous section if exists
-                if current_section:
-                    content = "\n".join(content_lines)
-                    section = MarkdownSection(
-                        level=current_section["level"],
-                        title=current_section["title"],
-                        start_line=current_section["start_line"],
-                        end_line=line_num - 1,
-                        content=content,
-                    )
-                    sections.append(section)
-
-                # Start new section
-                level = len(heading_match.group(1))
-                title = heading_match.group(2)
-                current_section = {
-                    "level": level,
-                    "title": title,
-                    "start_line": line_num,
-                }
-                content_lines = []
+        for i, match in enumerate(matches):
+            if i + 1 < len(matches):
+                body_end = matches[i + 1].start()
+                end_line = heading_lines[i + 1] - 1
             else:
-                if current_section:
-                    content_lines.append(line)
-
-        # Handle last section
-        if current_section:
-            content = "\n".join(content_lines)
-            section = MarkdownSection(
-                level=current_section["level"],
-                title=current_section["title"],
-                start_line=current_section["start_line"],
-                end_line=line_num,
-                content=content,
+                body_end = len(text)
+                end_line = total_lines
+
+            content = text[match.end() + 1 : body_end]
+            if content.endswith("\n"):
+                content = content[:-1]
+
+            sections.append(
+                MarkdownSection(
+                    level=len(match.group(1)),
+                    title=match.group(2),
+                    start_line=heading_lines[i],
+                    end_line=end_line,
+                    content=content,
+                )
             )
-            sections.append(section)
 
         return sections
 
     def get_sections(self) -> list[MarkdownSection]:
-        """Get all markdown sections."""
-        if not self.sections:
+        """Get all markdown sections.
+
+        The document is parsed on first use and re-parsed only when the
+        file's modification time or size changes.
+        """
+        st = self.file_path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        if self._sections_key != key:
             self.sections = self._parse_structure()
+            self._sections_key = key
         return self.sections
 
+    def _invalidate_sections(self) -> None:
+        """Drop the cached structure after the file is rewritten."""
+        self.sections = []
+        self._sections_key = None
+
     def find_section(self, title: str) -> Optional[MarkdownSection]:
         """Find section by title.
 
@@ -120,6 +160,87 @@ class MarkdownEditor(StreamEditor):
         sections = self.get_sections()
         return [s for s in sections if s.level == level]
 
+    def _section_spans(self) -> list[_SectionSpan]:
+        """Locate every section's byte range in one streaming pass."""
+        headings = []
+        offset = 0
+
+        with open(self.file_path, "rb", buffering=IO_BUFFER_SIZE) as f:
+            for line in f:
+                # Only heading candidates are decoded and matched
+                if line.startswith(b"#"):
+                    text = line.decode(self.encoding).rstrip("\r\n")
+                    heading_match = self.heading_pattern.match(text)
+                    if heading_match:
+                        headings.append(
+                            (
+                                offset,
+                                offset + len(line),
+                                len(heading_match.group(1)),
+                                heading_match.group(2),
+                            )
+                        )
+                offset += len(line)
+
+        spans = []
+        for i, (start, body_start, level, title) in enumerate(headings):
+            end = offset
+            for next_start, _, next_level, _ in headings[i + 1 :]:
+                if next_level <= level:
+                    end = next_start
+                    break
+            spans.append(_SectionSpan(start, body_start, end, level, title))
+
+        return spans
+
+    def _matching_spans(self, title: str) -> list[_SectionSpan]:
+        """Get non-overlapping sections with the given title, in file order."""
+        spans = []
+        pos = 0
+        for span in self._section_spans():
+            if span.title == title and span.start >= pos:
+                spans.append(span)
+                pos = span.end
+        return spans
+
+    def _rewrite(self, edits: list[tuple[int, int, bytes]]) -> None:
+        """Replace byte ranges of the file, streaming everything else.
+
+        Unchanged regions are copied block by block, so memory use does not
+        grow with the file size.
+
+        Args:
+            edits: Sorted, non-overlapping (start, end, data) replacements
+        """
+        with safe_edit_context(self.file_path) as safe_op:
+            temp_file = safe_op.get_temp_file()
+
+            with open(self.file_path, "rb") as src, open(
+                temp_file, "wb", buffering=IO_BUFFER_SIZE
+            ) as dst:
+                size = src.seek(0, 2)
+                if size:
+                    src.seek(size - 1)
+                    ends_with_newline = src.read(1) == b"\n"
+                else:
+                    ends_with_newline = True
+
+                pos = 0
+                for start, end, data in edits:
+                    copy_byte_range(src, dst, pos, start)
+                    # Keep text appended after an unterminated last line on
+                    # its own line
+                    if data and start == size and not ends_with_newline:
+                        data = b"\n" + data
+                    dst.write(data)
+                    pos = end
+                copy_byte_range(src, dst, pos, size)
+
+            safe_op.atomic_replace(temp_file)
+
+        # Cached structure no longer matches the file
+        self._invalidate_sections()
+
     def edit_section_streaming(self, target_title: str, new_content: str) -> bool:
         """Edit a markdown section using streaming approach.
 
@@ -131,45 +252,16 @@ class MarkdownEditor(StreamEditor):
             True if section was found and edited
         """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-                section_found = False
-
-                with open(self.file_path) as infile, open(temp_file, "w") as outfile:
-                    in_target_section = False
-                    current_level = 0
-
-                    for line in infile:
-                        line_stripped = line.rstrip("\n")
-                        heading_match = self.heading_pattern.match(line_stripped)
-
-                        if heading_match:
-                            level = len(heading_match.group(1))
-                            title = heading_match.group(2)
-
-                            if title == target_title:
-                                # Found target section
-                                in_target_section = True
-                                current_level = level
-                                section_found = True
-
-                                # Write heading and new content
-                                outfile.write(line)
-                                if new_content and not new_content.endswith("\n"):
-                                    new_content += "\n"
-                                outfile.write(new_content)
-                                continue
-
-                            elif in_target_section and level <= current_level:
-                                # End of target section
-                                in_target_section = False
-
-                        # Write line if not in target section content
-                        if not in_target_section:
-                            outfile.write(line)
-
-                safe_op.atomic_replace(temp_file)
-                return section_found
+            spans = self._matching_spans(target_title)
+            if not spans:
+                return False
+
+            if new_content and not new_content.endswith("\n"):
+                new_content += "\n"
+            data = new_content.encode(self.encoding)
+
+            self._rewrite([(span.body_start, span.end, data) for span in spans])
+            return True
 
         except Exception as e:
             logger.error(f"Failed to edit markdown section: {e}")
@@ -194,53 +286,20 @@ class MarkdownEditor(StreamEditor):
             True if insertion was successful
         """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-
-                heading = f"{'#' * level} {title}\n\n"
-                if content and not content.endswith("\n"):
-                    content += "\n"
-                new_section = heading + content + "\n"
-
-                if after_section is None:
-                    # Append to end
-                    with open(self.file_path) as infile, open(
-                        temp_file, "w"
-                    ) as outfile:
-                        outfile.write(infile.read())
-                        outfile.write(new_section)
-                else:
-                    # Insert after specified section
-                    with open(self.file_path) as infile, open(
-                        temp_file, "w"
-                    ) as outfile:
-                        in_target_section = False
-                        target_level = 0
-
-                        for line in infile:
-                            outfile.write(line)
-
-                            line_stripped = line.rstrip("\n")
-                            heading_match = self.heading_pattern.match(line_stripped)
-
-                            if heading_match:
-                                level_found = len(heading_match.group(1))
-                                title_found = heading_match.group(2)
-
-                                if title_found == after_section:
-                                    in_target_section = True
-                                    target_level = level_found
-                                elif in_target_section and level_found <= target_level:
-                                    # End of target section - insert here
-                                    outfile.write(new_section)
-                                    in_target_section = False
-
-                        # If we were still in target section at end, insert there
-                        if in_target_section:
-                            outfile.write(new_section)
-
-                safe_op.atomic_replace(temp_file)
-                return True
+            heading = f"{'#' * level} {title}\n\n"
+            if content and not content.endswith("\n"):
+                content += "\n"
+            data = (heading + content + "\n").encode(self.encoding)
+
+            if after_section is None:
+                # Append to end
+                end = self.file_path.stat().st_size
+                self._rewrite([(end, end, data)])
+            else:
+                # Insert where each matching section ends
+                spans = self._matching_spans(after_section)
+                self._rewrite([(span.end, span.end, data) for span in spans])
+            return True
 
         except Exception as e:
             logger.error(f"Failed to insert markdown section: {e}")
@@ -256,39 +315,12 @@ class MarkdownEditor(StreamEditor):
             True if section was found and removed
         """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-                section_found = False
-
-                with open(self.file_path) as infile, open(temp_file, "w") as outfile:
-                    in_target_section = False
-                    current_level = 0
-
-                    for line in infile:
-                        line_stripped = line.rstrip("\n")
-                        heading_match = self.heading_pattern.match(line_stripped)
-
-                        if heading_match:
-                            level = len(heading_match.group(1))
-                            title_found = heading_match.group(2)
+            spans = self._matching_spans(title)
+            if not spans:
+                return False
 
-                            if title_found == title:
-                                # Found target section - start skipping
-                                in_target_section = True
-                                current_level = level
-                                section_found = True
-                                continue
-
-                            elif in_target_section and level <= current_level:
-                                # End of target section
-                                in_target_section = False
-
-                        # Write line if not in target section
-                        if not in_target_section:
-                            outfile.write(line)
-
-                safe_op.atomic_replace(temp_file)
-                return section_found
+            self._rewrite([(span.start, span.end, b"") for span in spans])
+            return True
 
         except Exception as e:
             logger.error(f"Failed to remove markdown section: {e}")
@@ -301,17 +333,23 @@ class MarkdownEditor(StreamEditor):
             Markdown-formatted table of contents
         """
         sections = self.get_sections()
+        # Reuse the last TOC while the sections it was built from are current
+        if self._toc is not None and self._toc_key == self._sections_key:
+            return self._toc
+
         toc_lines = []
 
         for section in sections:
             # Create proper indentation based on level
             indent = "  " * (section.level - 1)
             # Create markdown link
-            link = section.title.lower().replace(" ", "-").replace(".", "")
+            link = _anchor(section.title)
             toc_line = f"{indent}- [{section.title}](#{link})"
             toc_lines.append(toc_line)
 
-        return "\n".join(toc_lines)
+        self._toc = "\n".join(toc_lines)
+        self._toc_key = self._sections_key
+        return self._toc
 
     def update_links(self, link_map: dict[str, str]) -> bool:
         """Update markdown links throughout the document.
@@ -322,29 +360,32 @@ class MarkdownEditor(StreamEditor):
         Returns:
             True if any links were updated
         """
-        link_pattern = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+        if not link_map:
+            return False
+
         updates_made = False
 
-        def update_line(line: str) -> str:
+        def replace_link(match: re.Match) -> str:
             nonlocal updates_made
+            url = match.group(2)
 
-            def replace_link(match):
-                nonlocal updates_made
-                text = match.group(1)
-                url = match.group(2)
+            if url in link_map:
+                updates_made = True
+                return f"[{match.group(1)}]({link_map[url]})"
+            return match.group(0)
 
-                if url in link_map:
-                    updates_made = True
-                    return f"[{text}]({link_map[url]})"
-                return match.group(0)
-
-            return link_pattern.sub(replace_link, line)
+        def update_line(line: str) -> str:
+            # Lines without link syntax skip the regex engine entirely
+            if "](" not in line:
+                return line
+            return _LINK_PATTERN.sub(replace_link, line)
 
         try:
             output_path = self.process_lines(update_line)
             if updates_made and output_path:
                 with safe_edit_context(self.file_path) as safe_op:
                     safe_op.atomic_replace(output_path)
+                self._invalidate_sections()
                 return True
 
         except Exception as e:
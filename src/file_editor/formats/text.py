@@ -1,17 +1,82 @@
 """Text file editing with line-based operations."""
+import codecs
 import logging
+import mmap
+import os
 import re
-from collections.abc import Callable, Iterator
+import tempfile
+from array import array
+from bisect import bisect_right
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import suppress
+from functools import partial
+from itertools import compress
+from operator import methodcaller
 from pathlib import Path
 from re import Pattern
 from typing import Optional, Union
 
-from ..core.safety import safe_edit_context
-from ..core.seek_editor import LineIndexedFile
-from ..core.stream_editor import ContextAwareStreamEditor
+from ..core.safety import SafeFileOperation, safe_edit_context
+from ..core.stream_editor import (
+    IO_BUFFER_SIZE,
+    ContextAwareStreamEditor,
+    _advise,
+    _compile,
+    copy_byte_range,
+)
 
 logger = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    np = None
+
+try:
+    import hyperscan
+
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+    hyperscan = None
+
+# Characters that make a search string a regex rather than a literal
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+# Line breaks in a literal could only match across lines in a byte search
+_LINE_BREAKS = frozenset("\r\n")
+
+# Lines handed to the regex engine per batch when scanning a file
+_SEARCH_BATCH_LINES = 4096
+
+# Bytes compared per vectorized newline scan; bounds the temporary mask
+_INDEX_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Sidecar line index layout: the file's (mtime_ns, size) as a header, then
+# one entry per line start, all native int64
+_INDEX_TYPECODE = "q"
+_INDEX_ENTRY_BYTES = array(_INDEX_TYPECODE).itemsize
+_INDEX_HEADER_BYTES = 2 * _INDEX_ENTRY_BYTES
+
+_strip_newline = methodcaller("rstrip", "\n")
+
+
+def _madvise(mm: mmap.mmap, advice: str) -> None:
+    """Hint the kernel about how a memory map will be accessed.
+
+    Args:
+        mm: Memory map
+        advice: MADV_* suffix, e.g. "SEQUENTIAL" or "RANDOM"
+    """
+    flag = getattr(mmap, f"MADV_{advice}", None)
+    if flag is None:
+        return
+    with suppress(OSError):
+        mm.madvise(flag)
+
 
 class TextEditor(ContextAwareStreamEditor):
     """Text file editor with advanced line-based operations.
@@ -29,6 +94,10 @@ class TextEditor(ContextAwareStreamEditor):
         """
         super().__init__(file_path)
         self.encoding = encoding
+        # Byte offset of the start of each line, keyed on the file's
+        # (mtime, size) so edits made elsewhere also invalidate it
+        self._line_offsets: Optional[Union[array, "np.ndarray"]] = None
+        self._line_offsets_key: Optional[tuple[int, int]] = None
 
     def find_lines(
         self, pattern: Union[str, Pattern], case_sensitive: bool = True
@@ -42,14 +111,167 @@ class TextEditor(ContextAwareStreamEditor):
         Yields:
             Tuples of (line_number, line_content)
         """
+        if (
+            isinstance(pattern, str)
+            and case_sensitive
+            and pattern
+            and not _REGEX_METACHARS.intersection(pattern)
+            and not _LINE_BREAKS.intersection(pattern)
+            and codecs.lookup(self.encoding).name == "utf-8"
+        ):
+            yield from self._find_literal_lines(pattern)
+            return
+
         if isinstance(pattern, str):
             flags = 0 if case_sensitive else re.IGNORECASE
-            pattern = re.compile(pattern, flags)
+            pattern = _compile(pattern, flags)
 
-        for line_num, line in enumerate(self.read_lines(), 1):
-            line_content = line.rstrip("\n")
-            if pattern.search(line_content):
-                yield (line_num, line_content)
+        yield from self._search_lines(pattern)
+
+    def _search_lines(self, pattern: Pattern) -> Iterator[tuple[int, str]]:
+        """Yield lines matching a compiled pattern, scanning in batches.
+
+        Stripping, searching and selecting run through map/compress, so
+        there is no Python-level loop iteration for non-matching lines.
+        """
+        search = pattern.search
+        line_count = 0
+
+        for batch in self.read_lines(batch_size=_SEARCH_BATCH_LINES):
+            lines = list(map(_strip_newline, batch))
+            yield from compress(enumerate(lines, line_count + 1), map(search, lines))
+            line_count += len(lines)
+
+    def _find_literal_lines(self, needle: str) -> Iterator[tuple[int, str]]:
+        """Yield lines containing a literal string using a mmap byte search.
+
+        UTF-8 is self-synchronising, so a byte-level hit on the encoded
+        needle is exactly a character-level hit. Files containing carriage
+        returns fall back to the line scan, which applies universal newlines.
+        """
+        with open(self.file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\r") != -1:
+                    yield from self._search_lines(_compile(re.escape(needle)))
+                    return
+
+                encoded = needle.encode("utf-8")
+                size = len(mm)
+                line_num = 1
+                counted = 0
+                pos = 0
+
+                while True:
+                    hit = mm.find(encoded, pos)
+                    if hit == -1:
+                        break
+
+                    line_start = mm.rfind(b"\n", 0, hit) + 1
+                    line_end = mm.find(b"\n", hit)
+                    if line_end == -1:
+                        line_end = size
+
+                    line_num += mm[counted:line_start].count(b"\n")
+                    counted = line_start
+                    yield (line_num, mm[line_start:line_end].decode("utf-8"))
+
+                    pos = line_end + 1
+
+    def find_lines_multi(
+        self, patterns: Iterable[str], case_sensitive: bool = True
+    ) -> Iterator[tuple[int, int, str]]:
+        """Find lines matching any of several patterns in one pass over the file.
+
+        When Hyperscan is installed all patterns are compiled into a single
+        database and matched together; otherwise every line is tested against
+        each compiled regex in turn. Patterns should match within one line.
+
+        Args:
+            patterns: Regex patterns to search for
+            case_sensitive: Whether search is case sensitive
+
+        Yields:
+            Tuples of (line_number, pattern_index, line_content), ordered by
+            line and then by pattern index
+        """
+        patterns = list(patterns)
+        if not patterns:
+            return
+
+        if HAS_HYPERSCAN and codecs.lookup(self.encoding).name == "utf-8":
+            matches = self._hyperscan_matches(patterns, case_sensitive)
+            if matches is not None:
+                yield from matches
+                return
+
+        flags = 0 if case_sensitive else re.IGNORECASE
+        searches = [_compile(pattern, flags).search for pattern in patterns]
+        line_count = 0
+
+        for batch in self.read_lines(batch_size=_SEARCH_BATCH_LINES):
+            for line in map(_strip_newline, batch):
+                line_count += 1
+                for pattern_index, search in enumerate(searches):
+                    if search(line):
+                        yield (line_count, pattern_index, line)
+
+    def _hyperscan_matches(
+        self, patterns: list[str], case_sensitive: bool
+    ) -> Optional[list[tuple[int, int, str]]]:
+        """Match all patterns with a streaming Hyperscan scan of the file.
+
+        Returns:
+            Sorted (line_number, pattern_index, line_content) tuples, or None
+            if Hyperscan cannot compile the patterns or the file contains
+            carriage returns, in which case the caller falls back to re
+        """
+        flags = hyperscan.HS_FLAG_MULTILINE | hyperscan.HS_FLAG_UTF8
+        flags |= hyperscan.HS_FLAG_UCP
+        if not case_sensitive:
+            flags |= hyperscan.HS_FLAG_CASELESS
+
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_STREAM)
+            db.compile(
+                expressions=[pattern.encode("utf-8") for pattern in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[flags] * len(patterns),
+            )
+        except Exception as e:
+            # Unsupported syntax such as backreferences or lookarounds
+            logger.debug(f"Hyperscan cannot compile patterns, using re: {e}")
+            return None
+
+        offsets = self._get_line_offsets()
+        hits: set[tuple[int, int]] = set()
+
+        def on_match(pattern_id: int, _start: int, end: int, _flags: int, _ctx) -> None:
+            hits.add((bisect_right(offsets, end - 1), pattern_id))
+
+        with open(self.file_path, "rb") as f:
+            with db.stream(match_event_handler=on_match) as stream:
+                while block := f.read(IO_BUFFER_SIZE):
+                    if b"\r" in block:
+                        return None
+                    stream.scan(block)
+
+            matches = []
+            line_text: dict[int, str] = {}
+            for line_num, pattern_id in sorted(hits):
+                if line_num not in line_text:
+                    start = int(offsets[line_num - 1])
+                    f.seek(start)
+                    if line_num < len(offsets):
+                        raw = f.read(int(offsets[line_num]) - start)
+                    else:
+                        raw = f.read()
+                    line_text[line_num] = raw.decode("utf-8").rstrip("\n")
+                matches.append((line_num, pattern_id, line_text[line_num]))
+
+        return matches
 
     def replace_in_lines(
         self,
@@ -68,7 +290,7 @@ class TextEditor(ContextAwareStreamEditor):
             True if any replacements were made
         """
         if isinstance(search_pattern, str):
-            pattern = re.compile(re.escape(search_pattern))
+            pattern = _compile(re.escape(search_pattern))
         else:
             pattern = search_pattern
 
@@ -87,7 +309,8 @@ class TextEditor(ContextAwareStreamEditor):
             output_path = self.process_lines(replace_line)
             if replacements_made > 0 and output_path:
                 with safe_edit_context(self.file_path) as safe_op:
-                    safe_op.atomic_replace(output_path)
+                    self._replace_file(safe_op, output_path)
+                self._invalidate_line_offsets()
                 logger.info(f"Made {replacements_made} replacements")
                 return True
 
@@ -96,46 +319,214 @@ class TextEditor(ContextAwareStreamEditor):
 
         return False
 
+    def _get_line_offsets(self) -> Union[array, "np.ndarray"]:
+        """Get the byte offset where each line starts, building it if stale.
+
+        Entry i is the start of line i + 1. A file ending in a newline gets a
+        final entry equal to its size.
+        """
+        st = os.stat(self.file_path)
+        key = (st.st_mtime_ns, st.st_size)
+        if self._line_offsets is None or self._line_offsets_key != key:
+            self._line_offsets = self._build_line_offsets()
+            self._line_offsets_key = key
+        return self._line_offsets
+
+    def _build_line_offsets(self) -> Union[array, "np.ndarray"]:
+        """Scan the file for newlines.
+
+        With NumPy the file is mapped and compared against the newline byte
+        in large zero-copy views, so the scan is a vectorized pass with no
+        reads.
+        """
+        if HAS_NUMPY:
+            with open(self.file_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                # Offsets never exceed the size, so files under 2 GiB fit in
+                # int32, halving the memory every index lookup touches
+                dtype = np.int32 if size < 2**31 else np.int64
+                parts = [np.zeros(1, dtype=dtype)]
+                if not size:
+                    return parts[0]
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # One front-to-back pass: let readahead run ahead of it
+                    _madvise(mm, "SEQUENTIAL")
+                    buf = np.frombuffer(mm, dtype=np.uint8)
+                    # One mask reused for every view instead of a fresh
+                    # allocation per comparison
+                    mask = np.empty(min(size, _INDEX_BLOCK_SIZE), dtype=np.bool_)
+                    for base in range(0, size, _INDEX_BLOCK_SIZE):
+                        view = buf[base : base + _INDEX_BLOCK_SIZE]
+                        hits = np.equal(view, 0x0A, out=mask[: len(view)])
+                        starts = np.flatnonzero(hits) + (base + 1)
+                        parts.append(starts.astype(dtype, copy=False))
+                    # The map cannot close while arrays still export it
+                    del buf, view
+            return np.concatenate(parts)
+
+        offsets = array("q", [0])
+        base = 0
+        with open(self.file_path, "rb") as f:
+            _advise(f, "SEQUENTIAL")
+            while block := f.read(IO_BUFFER_SIZE):
+                pos = block.find(b"\n")
+                while pos != -1:
+                    offsets.append(base + pos + 1)
+                    pos = block.find(b"\n", pos + 1)
+                base += len(block)
+        return offsets
+
+    def _invalidate_line_offsets(self) -> None:
+        """Drop the cached line index after the file is rewritten."""
+        self._line_offsets = None
+        self._line_offsets_key = None
+
+    def _line_starts(self, line_numbers: list[int]) -> list[int]:
+        """Find the byte offset where each 1-based line starts.
+
+        Lookups go through the cached line index, so repeated edits do not
+        rescan the file. Lines past the end of the file map to the file size.
+
+        Args:
+            line_numbers: Line numbers to locate
+
+        Returns:
+            Byte offsets in the same order
+        """
+        offsets = self._get_line_offsets()
+        count = len(offsets)
+        size = self._line_offsets_key[1]
+        return [
+            int(offsets[max(n, 1) - 1]) if n <= count else size for n in line_numbers
+        ]
+
+    @staticmethod
+    def _join_lines(lines: list[str]) -> str:
+        """Join lines for writing, terminating each with a newline."""
+        return "".join(line if line.endswith("\n") else line + "\n" for line in lines)
+
+    def _encode_lines(self, lines: list[str]) -> bytes:
+        """Encode lines for writing, terminating each with a newline."""
+        return self._join_lines(lines).encode(self.encoding)
+
+    def _splices_bytes(self) -> bool:
+        """Whether line edits can splice the file by byte offset.
+
+        The line index looks for newline bytes, so this needs an encoding in
+        which a newline is the single byte 0x0A (not UTF-16 or UTF-32).
+        """
+        return "\n".encode(self.encoding) == b"\n"
+
+    def _replace_file(self, safe_op: SafeFileOperation, source: Path) -> None:
+        """Move an edited copy over the file; every in-place writer ends here."""
+        safe_op.atomic_replace(source)
+
+    def _rewrite_lines(
+        self,
+        start_line: int,
+        end_line: int,
+        replace: Callable[[list[str]], str],
+        append: bool = True,
+    ) -> None:
+        """Replace a range of lines by decoding and re-encoding the file.
+
+        Used instead of _splice for encodings it cannot handle, with the
+        same results as the byte path.
+
+        Args:
+            start_line: First line of the range (1-based)
+            end_line: Last line of the range (inclusive); below start_line
+                for an empty range, which inserts before start_line
+            replace: Given the lines in the range, each with its newline,
+                returns the text to write in their place
+            append: Whether a range past the last line appends to the file
+        """
+        with safe_edit_context(self.file_path) as safe_op:
+            temp_file = safe_op.get_temp_file()
+
+            # Only "\n" ends a line, as in the byte path
+            with open(
+                self.file_path, encoding=self.encoding, newline="\n"
+            ) as src, open(temp_file, "w", encoding=self.encoding, newline="") as dst:
+                # Last line of the range; an empty range ends just before it
+                stop = max(end_line, start_line - 1)
+                selected: list[str] = []
+                written = False
+                line = ""
+                for line_num, line in enumerate(src, 1):
+                    if start_line <= line_num <= stop:
+                        selected.append(line)
+                        continue
+                    if line_num > stop and not written:
+                        dst.write(replace(selected))
+                        written = True
+                    dst.write(line)
+
+                if not written and (append or selected):
+                    text = replace(selected)
+                    # Keep new lines off an unterminated last line
+                    if text and not selected and line and not line.endswith("\n"):
+                        dst.write("\n")
+                    dst.write(text)
+
+            self._replace_file(safe_op, temp_file)
+
+        self._invalidate_line_offsets()
+
+    def _splice(self, start: int, end: int, data: bytes) -> None:
+        """Replace bytes [start, end) of the file with data.
+
+        The unchanged head and tail are copied as raw bytes, so neither is
+        decoded or re-encoded.
+        """
+        if "\n".encode(self.encoding) != b"\n":
+            raise ValueError(
+                f"Line editing requires an ASCII-compatible encoding, "
+                f"got {self.encoding}"
+            )
+
+        with safe_edit_context(self.file_path) as safe_op:
+            temp_file = safe_op.get_temp_file()
+
+            with open(self.file_path, "rb") as src, open(
+                temp_file, "wb", buffering=IO_BUFFER_SIZE
+            ) as dst:
+                size = src.seek(0, os.SEEK_END)
+                copy_byte_range(src, dst, 0, start)
+                if data and start == size and size:
+                    # Keep new lines off an unterminated last line
+                    src.seek(size - 1)
+                    if src.read(1) != b"\n":
+                        dst.write(b"\n")
+                dst.write(data)
+                copy_byte_range(src, dst, end, size)
+
+            self._replace_file(safe_op, temp_file)
+
+        self._invalidate_line_offsets()
+
     def insert_lines(self, line_number: int, lines: list[str]) -> bool:
         """Insert lines at a specific position.
 
         Args:
-            line_number: Line number to insert at (1-based)
-            lines: Lines to insert
+            line_number: Line number to insert at (1-based); numbers past
+                the last line append to the end of the file
 
         Returns:
             True if insertion was successful
         """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-
-                with open(self.file_path, encoding=self.encoding) as infile, open(
-                    temp_file, "w", encoding=self.encoding
-                ) as outfile:
-                    current_line = 1
-
-                    for line in infile:
-                        if current_line == line_number:
-                            # Insert new lines
-                            for new_line in lines:
-                                if not new_line.endswith("\n"):
-                                    new_line += "\n"
-                                outfile.write(new_line)
-
-                        outfile.write(line)
-                        current_line += 1
-
-                    # Handle case where insertion is at end of file
-                    if line_number > current_line:
-                        for new_line in lines:
-                            if not new_line.endswith("\n"):
-                                new_line += "\n"
-                            outfile.write(new_line)
-
-                safe_op.atomic_replace(temp_file)
+            if line_number < 1:
+                return True
+            if not self._splices_bytes():
+                text = self._join_lines(lines)
+                self._rewrite_lines(line_number, line_number - 1, lambda _: text)
                 return True
 
+            (offset,) = self._line_starts([line_number])
+            self._splice(offset, offset, self._encode_lines(lines))
+            return True
+
         except Exception as e:
             logger.error(f"Failed to insert lines: {e}")
             return False
@@ -154,22 +545,17 @@ class TextEditor(ContextAwareStreamEditor):
             end_line = start_line
 
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-
-                with open(self.file_path, encoding=self.encoding) as infile, open(
-                    temp_file, "w", encoding=self.encoding
-                ) as outfile:
-                    current_line = 1
-
-                    for line in infile:
-                        if not (start_line <= current_line <= end_line):
-                            outfile.write(line)
-                        current_line += 1
-
-                safe_op.atomic_replace(temp_file)
+            start_line = max(start_line, 1)
+            if start_line > end_line:
+                return True
+            if not self._splices_bytes():
+                self._rewrite_lines(start_line, end_line, lambda _: "")
                 return True
 
+            start, end = self._line_starts([start_line, end_line + 1])
+            self._splice(start, end, b"")
+            return True
+
         except Exception as e:
             logger.error(f"Failed to delete lines: {e}")
             return False
@@ -188,29 +574,19 @@ class TextEditor(ContextAwareStreamEditor):
             True if replacement was successful
         """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-
-                with open(self.file_path, encoding=self.encoding) as infile, open(
-                    temp_file, "w", encoding=self.encoding
-                ) as outfile:
-                    current_line = 1
-
-                    for line in infile:
-                        if current_line == start_line:
-                            # Write replacement lines
-                            for new_line in new_lines:
-                                if not new_line.endswith("\n"):
-                                    new_line += "\n"
-                                outfile.write(new_line)
-
-                        if not (start_line <= current_line <= end_line):
-                            outfile.write(line)
-
-                        current_line += 1
-
-                safe_op.atomic_replace(temp_file)
+            if start_line < 1:
                 return True
+            if not self._splices_bytes():
+                text = self._join_lines(new_lines)
+                # Nothing to replace past the end of the file
+                self._rewrite_lines(start_line, end_line, lambda _: text, append=False)
+                return True
+
+            start, end = self._line_starts([start_line, max(end_line + 1, start_line)])
+            # Nothing to replace past the end of the file
+            if start < end or start < self.file_path.stat().st_size:
+                self._splice(start, end, self._encode_lines(new_lines))
+            return True
 
         except Exception as e:
             logger.error(f"Failed to replace lines: {e}")
@@ -229,13 +605,9 @@ class TextEditor(ContextAwareStreamEditor):
         Returns:
             True if commenting was successful
         """
-
-        def process_line(line: str, line_num: int) -> str:
-            if start_line <= line_num <= end_line:
-                return comment_prefix + line
-            return line
-
-        return self._process_lines_with_numbers(process_line)
+        return self._transform_lines(
+            start_line, end_line, lambda line: comment_prefix + line
+        )
 
     def uncomment_lines(
         self, start_line: int, end_line: int, comment_prefix: str = "# "
@@ -250,30 +622,54 @@ class TextEditor(ContextAwareStreamEditor):
         Returns:
             True if uncommenting was successful
         """
+        return self._transform_lines(
+            start_line, end_line, methodcaller("removeprefix", comment_prefix)
+        )
 
-        def process_line(line: str, line_num: int) -> str:
-            if start_line <= line_num <= end_line and line.startswith(comment_prefix):
-                return line[len(comment_prefix) :]
-            return line
-
-        return self._process_lines_with_numbers(process_line)
+    def _transform_lines(
+        self, start_line: int, end_line: int, transform: Callable[[str], str]
+    ) -> bool:
+        """Apply a transformation to a range of lines.
 
-    def _process_lines_with_numbers(self, processor: Callable[[str, int], str]) -> bool:
-        """Process lines with line numbers."""
+        Only the bytes of the affected lines are decoded and rewritten; the
+        rest of the file is copied through unchanged. The transform receives
+        each line without its trailing newline.
+        """
         try:
-            with safe_edit_context(self.file_path) as safe_op:
-                temp_file = safe_op.get_temp_file()
-
-                with open(self.file_path, encoding=self.encoding) as infile, open(
-                    temp_file, "w", encoding=self.encoding
-                ) as outfile:
-                    for line_num, line in enumerate(infile, 1):
-                        processed_line = processor(line, line_num)
-                        outfile.write(processed_line)
+            start_line = max(start_line, 1)
+            if start_line > end_line:
+                return True
+            if not self._splices_bytes():
+
+                def transform_block(lines: list[str]) -> str:
+                    parts = []
+                    for line in lines:
+                        if line.endswith("\n"):
+                            parts.append(transform(line[:-1]) + "\n")
+                        else:
+                            parts.append(transform(line))
+                    return "".join(parts)
+
+                self._rewrite_lines(start_line, end_line, transform_block)
+                return True
 
-                safe_op.atomic_replace(temp_file)
+            start, end = self._line_starts([start_line, end_line + 1])
+            if start == end:
                 return True
 
+            with open(self.file_path, "rb") as f:
+                f.seek(start)
+                text = f.read(end - start).decode(self.encoding)
+
+            lines = text.split("\n")
+            # Text after the last newline is an unterminated final line
+            last = lines.pop()
+            lines = list(map(transform, lines))
+            lines.append(transform(last) if last else "")
+
+            self._splice(start, end, "\n".join(lines).encode(self.encoding))
+            return True
+
         except Exception as e:
             logger.error(f"Failed to process lines: {e}")
             return False
@@ -292,12 +688,10 @@ class TextEditor(ContextAwareStreamEditor):
             True if indentation was successful
         """
 
-        def process_line(line: str, line_num: int) -> str:
-            if start_line <= line_num <= end_line and line.strip():
-                return indent + line
-            return line
+        def indent_line(line: str) -> str:
+            return indent + line if line.strip() else line
 
-        return self._process_lines_with_numbers(process_line)
+        return self._transform_lines(start_line, end_line, indent_line)
 
     def dedent_lines(
         self, start_line: int, end_line: int, dedent_amount: int = 4
@@ -312,20 +706,14 @@ class TextEditor(ContextAwareStreamEditor):
         Returns:
             True if dedentation was successful
         """
+        if dedent_amount <= 0:
+            return True
 
-        def process_line(line: str, line_num: int) -> str:
-            if start_line <= line_num <= end_line:
-                # Remove up to dedent_amount leading spaces
-                spaces_to_remove = 0
-                for char in line:
-                    if char == " " and spaces_to_remove < dedent_amount:
-                        spaces_to_remove += 1
-                    else:
-                        break
-                return line[spaces_to_remove:]
-            return line
-
-        return self._process_lines_with_numbers(process_line)
+        # Remove up to dedent_amount leading spaces
+        leading_spaces = _compile(f"^ {{1,{dedent_amount}}}")
+        return self._transform_lines(
+            start_line, end_line, partial(leading_spaces.sub, "")
+        )
 
     def extract_section(
         self,
@@ -344,9 +732,9 @@ class TextEditor(ContextAwareStreamEditor):
             List of lines in the section
         """
         if isinstance(start_pattern, str):
-            start_pattern = re.compile(start_pattern)
+            start_pattern = _compile(start_pattern)
         if isinstance(end_pattern, str):
-            end_pattern = re.compile(end_pattern)
+            end_pattern = _compile(end_pattern)
 
         section_lines = []
         in_section = False
@@ -379,34 +767,194 @@ class TextEditor(ContextAwareStreamEditor):
         char_count = 0
         word_count = 0
         line_count = 0
-
-        for line in self.read_lines():
+        in_word = False
+        last_char = ""
+
+        # Count over large decoded blocks so str.count/str.split do the work
+        # in C; a word split across two blocks is only counted once
+        with open(
+            self.file_path, encoding=self.encoding, buffering=IO_BUFFER_SIZE
+        ) as f:
+            while True:
+                block = f.read(IO_BUFFER_SIZE)
+                if not block:
+                    break
+
+                char_count += len(block)
+                line_count += block.count("\n")
+                word_count += len(block.split())
+                if in_word and not block[0].isspace():
+                    word_count -= 1
+
+                last_char = block[-1]
+                in_word = not last_char.isspace()
+
+        if last_char and last_char != "\n":
             line_count += 1
-            char_count += len(line)
-            words = line.split()
-            word_count += len(words)
 
         return {"characters": char_count, "words": word_count, "lines": line_count}
 
 
 class FastTextEditor(TextEditor):
-    """Text editor optimized for common operations using line indexing."""
+    """Text editor optimized for common operations using line indexing.
 
-    def __init__(self, file_path: Union[str, Path], encoding: str = "utf-8"):
+    Lines are sliced straight out of a read-only memory map of the file using
+    the cached line start index, so random access needs no seek or read
+    calls. The map is replaced whenever the file changes.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        encoding: str = "utf-8",
+        persist_index: bool = False,
+    ):
         """Initialize fast text editor with line indexing.
 
         Args:
             file_path: Path to text file
             encoding: File encoding
+            persist_index: Keep the line index in a sidecar file next to the
+                text file, so later editors skip the newline scan
         """
         super().__init__(file_path, encoding)
-        self._indexed_file: Optional[LineIndexedFile] = None
+        self.persist_index = persist_index
+        self.index_path = self.file_path.with_name(self.file_path.name + ".idx")
+        self._mm: Optional[mmap.mmap] = None
+        self._mm_key: Optional[tuple[int, int]] = None
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+    def __del__(self):
+        """Release the memory map when the editor is garbage collected."""
+        if getattr(self, "_mm", None) is not None:
+            self.close()
+
+    def close(self) -> None:
+        """Release the memory map of the file."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._mm_key = None
+
+    def _invalidate_line_offsets(self) -> None:
+        """Drop the cached line index and the map of the old file."""
+        super()._invalidate_line_offsets()
+        self.close()
+
+    def _build_line_offsets(self) -> Union[array, "np.ndarray"]:
+        """Load the line index from the sidecar file, or scan and save it."""
+        if not self.persist_index:
+            return super()._build_line_offsets()
+
+        st = os.stat(self.file_path)
+        key = (st.st_mtime_ns, st.st_size)
+        offsets = self._load_index(key)
+        if offsets is None:
+            offsets = super()._build_line_offsets()
+            self._save_index(key, offsets)
+        return offsets
+
+    def _load_index(self, key: tuple[int, int]) -> Optional[Union[array, "np.ndarray"]]:
+        """Read a saved line index if it was built from the current file."""
+        try:
+            raw = self.index_path.read_bytes()
+        except OSError:
+            return None
+        # At least the header and the first line's offset
+        if (
+            len(raw) < _INDEX_HEADER_BYTES + _INDEX_ENTRY_BYTES
+            or len(raw) % _INDEX_ENTRY_BYTES
+        ):
+            return None
+        header = array(_INDEX_TYPECODE)
+        header.frombytes(raw[:_INDEX_HEADER_BYTES])
+        if tuple(header) != key:
+            return None
+
+        if HAS_NUMPY:
+            offsets = np.frombuffer(raw, dtype=np.int64, offset=_INDEX_HEADER_BYTES)
+            # Match the dtype a fresh scan would produce
+            return offsets.astype(np.int32) if key[1] < 2**31 else offsets
+        offsets = array(_INDEX_TYPECODE)
+        offsets.frombytes(raw[_INDEX_HEADER_BYTES:])
+        return offsets
+
+    def _save_index(
+        self, key: tuple[int, int], offsets: Union[array, "np.ndarray"]
+    ) -> None:
+        """Write the line index to the sidecar file; failures are not fatal."""
+        if isinstance(offsets, array):
+            data = offsets.tobytes()
+        else:
+            data = offsets.astype(np.int64).tobytes()
 
-    def _get_indexed_file(self) -> LineIndexedFile:
-        """Get or create line-indexed file."""
-        if self._indexed_file is None:
-            self._indexed_file = LineIndexedFile(self.file_path)
-        return self._indexed_file
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self.index_path.parent,
+                prefix=f".{self.index_path.name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as tmp:
+                tmp.write(array(_INDEX_TYPECODE, key).tobytes())
+                tmp.write(data)
+            os.replace(tmp.name, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not save line index {self.index_path}: {e}")
+
+    def _replace_file(self, safe_op: SafeFileOperation, source: Path) -> None:
+        """Move an edited copy over the file.
+
+        The map is released first: a mapped file cannot be replaced on
+        Windows.
+        """
+        self.close()
+        super()._replace_file(safe_op, source)
+
+    def _mapped(self) -> tuple[Union[mmap.mmap, bytes], Union[array, "np.ndarray"]]:
+        """Get the mapped file contents and its line start index."""
+        offsets = self._get_line_offsets()
+        if self._mm_key != self._line_offsets_key:
+            self.close()
+            # Empty files cannot be mapped
+            if self._line_offsets_key[1]:
+                with open(self.file_path, "rb") as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Lines are fetched by offset in any order; readahead around
+                # each access would mostly fault in pages nobody asked for
+                _madvise(self._mm, "RANDOM")
+            self._mm_key = self._line_offsets_key
+        return (self._mm if self._mm is not None else b""), offsets
+
+    def ensure_indexed(self) -> None:
+        """Build the line index and map the file now.
+
+        Both are otherwise created lazily on the first line access; calling
+        this up front keeps that one-off cost out of later timed accesses.
+        """
+        self._mapped()
+
+    @staticmethod
+    def _line_count(offsets: Union[array, "np.ndarray"], size: int) -> int:
+        """Count lines; a newline at the end of the file does not start one."""
+        if size and offsets[-1] == size:
+            return len(offsets) - 1
+        return len(offsets)
+
+    @staticmethod
+    def _line_end(
+        offsets: Union[array, "np.ndarray"], line_number: int, size: int
+    ) -> int:
+        """Get the byte offset just past a line's content, before its newline."""
+        if line_number < len(offsets):
+            return int(offsets[line_number]) - 1
+        return size
 
     def get_line(self, line_number: int) -> str:
         """Get a specific line efficiently.
@@ -416,13 +964,87 @@ class FastTextEditor(TextEditor):
 
         Returns:
             Line content
+
+        Raises:
+            IndexError: If the line does not exist
+        """
+        return self.get_line_bytes(line_number).decode(self.encoding, errors="replace")
+
+    def get_line_bytes(self, line_number: int) -> bytes:
+        """Get a specific line as raw bytes, without decoding it.
+
+        Cheaper than get_line for callers that only need lengths or compare
+        against encoded values.
+
+        Args:
+            line_number: Line number (1-based)
+
+        Returns:
+            Line content, without its newline
+
+        Raises:
+            IndexError: If the line does not exist
         """
-        indexed_file = self._get_indexed_file()
-        return indexed_file.get_line(line_number - 1)  # Convert to 0-based
+        data, offsets = self._mapped()
+        size = len(data)
+        if not 1 <= line_number <= self._line_count(offsets, size):
+            raise IndexError(f"Line {line_number} out of range")
+
+        start = int(offsets[line_number - 1])
+        end = self._line_end(offsets, line_number, size)
+        return data[start:end]
+
+    def get_lines_by_indices(
+        self, line_numbers: Union[Iterable[int], "np.ndarray"]
+    ) -> list[str]:
+        """Get many lines, in any order, with one call.
+
+        Byte ranges for all requested lines are looked up at once (with NumPy
+        fancy indexing when available), so the per-line cost is a slice and
+        a decode rather than a full get_line call.
+
+        Args:
+            line_numbers: Line numbers (1-based) to fetch
+
+        Returns:
+            Lines in the order requested
+
+        Raises:
+            IndexError: If any line does not exist
+        """
+        data, offsets = self._mapped()
+        size = len(data)
+        count = self._line_count(offsets, size)
+
+        if HAS_NUMPY:
+            if not isinstance(line_numbers, np.ndarray):
+                line_numbers = list(line_numbers)
+            numbers = np.asarray(line_numbers, dtype=np.int64)
+            if numbers.size and (numbers.min() < 1 or numbers.max() > count):
+                raise IndexError("Line number out of range")
+            last = len(offsets) - 1
+            starts = offsets[numbers - 1].tolist()
+            ends = np.where(
+                numbers <= last, offsets[np.minimum(numbers, last)] - 1, size
+            ).tolist()
+        else:
+            numbers = list(line_numbers)
+            if numbers and (min(numbers) < 1 or max(numbers) > count):
+                raise IndexError("Line number out of range")
+            starts = [offsets[n - 1] for n in numbers]
+            ends = [self._line_end(offsets, n, size) for n in numbers]
+
+        encoding = self.encoding
+        return [
+            data[start:end].decode(encoding, errors="replace")
+            for start, end in zip(starts, ends, strict=True)
+        ]
 
     def get_lines_range(self, start_line: int, end_line: int) -> list[str]:
         """Get a range of lines efficiently.
 
+        The whole range is decoded from a single slice of the map.
+
         Args:
             start_line: Starting line number (1-based, inclusive)
             end_line: Ending line number (1-based, inclusive)
@@ -430,8 +1052,16 @@ class FastTextEditor(TextEditor):
         Returns:
             List of lines
         """
-        indexed_file = self._get_indexed_file()
-        return indexed_file.get_lines(start_line - 1, end_line)  # Convert to 0-based
+        data, offsets = self._mapped()
+        size = len(data)
+        start_line = max(start_line, 1)
+        end_line = min(end_line, self._line_count(offsets, size))
+        if start_line > end_line:
+            return []
+
+        start = int(offsets[start_line - 1])
+        end = self._line_end(offsets, end_line, size)
+        return data[start:end].decode(self.encoding, errors="replace").split("\n")
 
     def replace_line_fast(self, line_number: int, new_content: str) -> bool:
         """Replace a single line efficiently.
@@ -444,14 +1074,48 @@ class FastTextEditor(TextEditor):
             True if replacement was successful
         """
         try:
-            indexed_file = self._get_indexed_file()
-            indexed_file.replace_line(
-                line_number - 1, new_content
-            )  # Convert to 0-based
-            # Invalidate cached index since file changed
-            self._indexed_file = None
+            data, offsets = self._mapped()
+            size = len(data)
+            if not 1 <= line_number <= self._line_count(offsets, size):
+                raise IndexError(f"Line {line_number} out of range")
+
+            if not new_content.endswith("\n"):
+                new_content += "\n"
+            data = new_content.encode(self.encoding)
+
+            start = int(offsets[line_number - 1])
+            end = int(offsets[line_number]) if line_number < len(offsets) else size
+            if (
+                line_number < len(offsets)
+                and len(data) == end - start
+                and data.count(b"\n") == 1
+            ):
+                self._overwrite(start, data)
+            else:
+                self._splice(start, end, data)
             return True
 
         except Exception as e:
             logger.error(f"Failed to replace line: {e}")
             return False
+
+    def _overwrite(self, offset: int, data: bytes) -> None:
+        """Write data over existing bytes without changing the line layout.
+
+        Used when a replacement line has the same encoded length and still
+        ends at the same newline: a single in-place write replaces copying
+        the whole file, and the line index and map remain valid.
+        """
+        old_key = self._line_offsets_key
+
+        with SafeFileOperation(self.file_path, create_backup=False), open(
+            self.file_path, "r+b"
+        ) as f:
+            f.seek(offset)
+            f.write(data)
+
+        st = os.stat(self.file_path)
+        key = (st.st_mtime_ns, st.st_size)
+        self._line_offsets_key = key
+        if self._mm_key == old_key:
+            self._mm_key = key
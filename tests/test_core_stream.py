@@ -1,12 +1,17 @@
 """Comprehensive tests for streaming file operations."""
+import io
+import os
 import tempfile
+import threading
 from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock, patch
 
 import pytest
 from file_editor.core.stream_editor import (
     ContextAwareStreamEditor,
     StreamEditor,
+    copy_byte_range,
     parallel_chunk_processor,
     stream_copy_with_transform,
 )
@@ -57,6 +62,62 @@ class TestStreamEditor:
         assert chunks[1] == "o " + "Hello " * 66 + "He"  # 400 chars
         assert len(chunks[2]) == 400  # Remaining chars
 
+    def test_read_chunks_text_multibyte(self) -> None:
+        """Test text chunks count characters, not bytes, across blocks."""
+        test_data = "héllo wörld ✓\r\n" * 10000
+        self.test_file.write_bytes(test_data.encode("utf-8"))
+
+        editor = StreamEditor(self.test_file, chunk_size=7)
+        chunks = list(editor.read_chunks(binary=False))
+
+        assert all(len(chunk) == 7 for chunk in chunks[:-1])
+        assert "".join(chunks) == test_data
+
+    def test_read_chunks_prefetched(self) -> None:
+        """Test prefetched chunk reading matches plain chunk reading."""
+        test_data = b"0123456789" * 1000
+        self.test_file.write_bytes(test_data)
+
+        editor = StreamEditor(self.test_file, chunk_size=256)
+        prefetched = list(editor.read_chunks_prefetched(binary=True))
+
+        assert prefetched == list(editor.read_chunks(binary=True))
+        assert b"".join(prefetched) == test_data
+
+        # Both readers default to the same mode
+        assert list(editor.read_chunks_prefetched()) == list(editor.read_chunks())
+        assert list(editor.read_chunks_prefetched(binary=False)) == list(
+            editor.read_chunks(binary=False)
+        )
+
+        # Abandoning the generator early must not leave the reader blocked
+        chunks = editor.read_chunks_prefetched(binary=True, prefetch=1)
+        assert next(chunks) == test_data[:256]
+        chunks.close()
+
+    def test_process_chunks_stops_reader_on_error(self) -> None:
+        """Test a failing processor does not leave the reader thread running."""
+        self.test_file.write_bytes(b"0123456789" * 1000)
+        editor = StreamEditor(self.test_file, chunk_size=64)
+        threads = set(threading.enumerate())
+
+        def fail(chunk: bytes) -> bytes:
+            raise ValueError("processing failed")
+
+        output_path = Path(self.temp_dir) / "out"
+        with pytest.raises(ValueError):
+            editor.process_chunks(fail, output_path=output_path)
+        assert set(threading.enumerate()) <= threads
+
+        # The reader is closed explicitly, not left to garbage collection
+        chunks = MagicMock()
+        chunks.__iter__.return_value = iter([b"data"])
+        with patch.object(
+            editor, "read_chunks_prefetched", return_value=chunks
+        ), pytest.raises(ValueError):
+            editor.process_chunks(fail, output_path=output_path)
+        chunks.close.assert_called_once()
+
     def test_read_lines_individual(self) -> None:
         """Test reading lines individually."""
         lines = [f"Line {i}" for i in range(100)]
@@ -105,6 +166,18 @@ class TestStreamEditor:
         # Clean up
         output_path.unlink()
 
+    def test_process_chunks_keeps_line_endings(self) -> None:
+        """Test text chunk processing round-trips CRLF and lone CR endings."""
+        test_data = b"first\r\nsecond\rthird\n" * 50
+        self.test_file.write_bytes(test_data)
+
+        editor = StreamEditor(self.test_file, chunk_size=7)
+        output_path = editor.process_chunks(
+            str.upper, output_path=Path(self.temp_dir) / "out.txt", binary=False
+        )
+
+        assert output_path.read_bytes() == test_data.upper()
+
     def test_process_lines(self) -> None:
         """Test line processing with transformation."""
         lines = [f"line {i}" for i in range(50)]
@@ -149,6 +222,24 @@ class TestStreamEditor:
         # Clean up
         output_path.unlink()
 
+    def test_filter_lines_by_int_field(self) -> None:
+        """Test filtering lines on an integer field."""
+        lines = [f"line {i} extra" for i in range(100)] + ["line x", "short"]
+        self.test_file.write_text("\n".join(lines))
+
+        editor = StreamEditor(self.test_file)
+        output_path = editor.filter_lines_by_int_field(
+            lambda value: value % 2 == 0, field=1
+        )
+
+        assert output_path is not None
+        result_lines = output_path.read_text().strip().split("\n")
+        assert len(result_lines) == 50
+        assert result_lines[0] == "line 0 extra"
+        assert "line 1 extra" not in result_lines
+
+        output_path.unlink()
+
     def test_count_lines(self) -> None:
         """Test line counting functionality."""
         lines = [f"Line {i}" for i in range(1000)]
@@ -159,6 +250,23 @@ class TestStreamEditor:
         count = editor.count_lines()
         assert count == 1000
 
+        # A trailing newline does not start another line
+        self.test_file.write_text(test_data + "\n")
+        assert editor.count_lines() == 1000
+
+    def test_count_lines_matches_read_lines(self) -> None:
+        """Test line counting where newline bytes alone would miscount."""
+        editor = StreamEditor(self.test_file)
+
+        # Lone carriage returns break lines just like read_lines does
+        self.test_file.write_bytes(b"a\rb\r\nc\nd\r")
+        assert editor.count_lines() == len(list(editor.read_lines())) == 4
+
+        # utf-16 encodes a newline as two bytes
+        editor.encoding = "utf-16"
+        self.test_file.write_text("first\nsecond\nthird", encoding="utf-16")
+        assert editor.count_lines() == len(list(editor.read_lines())) == 3
+
     def test_head_operation(self) -> None:
         """Test getting first n lines."""
         lines = [f"Line {i}" for i in range(100)]
@@ -198,6 +306,27 @@ class TestStreamEditor:
         assert tail_lines[0] == "Line 75"
         assert tail_lines[24] == "Line 99"
 
+    def test_tail_across_chunk_boundaries(self) -> None:
+        """Test tail when the requested lines span several read blocks."""
+        lines = [f"Line {i}" for i in range(500)]
+        self.test_file.write_text("\n".join(lines) + "\n")
+
+        editor = StreamEditor(self.test_file, chunk_size=64)
+
+        assert editor.tail(50) == lines[-50:]
+        assert editor.tail(1000) == lines
+        assert editor.tail(0) == []
+
+    def test_tail_uses_editor_encoding(self) -> None:
+        """Test tail decodes with the editor's encoding."""
+        self.test_file.write_bytes("première\ndeuxième\n".encode("latin-1"))
+
+        editor = StreamEditor(self.test_file, chunk_size=4)
+        editor.encoding = "latin-1"
+
+        assert editor.tail(1) == ["deuxième"]
+        assert editor.tail(5) == ["première", "deuxième"]
+
     def test_grep_functionality(self) -> None:
         """Test grep-like search functionality."""
         lines = [
@@ -360,6 +489,37 @@ class TestStreamHelpers:
 
         shutil.rmtree(self.temp_dir)
 
+    def test_copy_byte_range(self) -> None:
+        """Test byte range copies through the kernel and buffered fallbacks."""
+        source = Path(self.temp_dir) / "source.bin"
+        dest = Path(self.temp_dir) / "dest.bin"
+        data = os.urandom(300 * 1024)
+        source.write_bytes(data)
+
+        def copy() -> bytes:
+            with open(source, "rb") as src, open(dest, "wb") as dst:
+                dst.write(b"head")
+                copy_byte_range(src, dst, 100, 250 * 1024)
+                dst.write(b"tail")
+            return dest.read_bytes()
+
+        def refuse(*args: Any) -> int:
+            raise OSError("not supported")
+
+        expected = b"head" + data[100 : 250 * 1024] + b"tail"
+        assert copy() == expected
+
+        module = "file_editor.core.stream_editor._copy_file_range"
+        with patch(module, refuse):
+            assert copy() == expected
+        with patch(module, None):
+            assert copy() == expected
+
+        # Objects without a file descriptor use the buffered loop
+        dst_buffer = io.BytesIO()
+        copy_byte_range(io.BytesIO(data), dst_buffer, 10, 200 * 1024)
+        assert dst_buffer.getvalue() == data[10 : 200 * 1024]
+
     def test_stream_copy_with_transform(self) -> None:
         """Test stream copy with transformation."""
         source = Path(self.temp_dir) / "source.bin"
@@ -402,6 +562,29 @@ class TestStreamHelpers:
             assert processed_chunk == processed_chunk.lower()
             assert len(processed_chunk) == 400
 
+    def test_parallel_chunk_processor_thread_pool(self) -> None:
+        """Test threaded chunk processing keeps results in file order."""
+        test_file = Path(self.temp_dir) / "test.bin"
+        test_data = bytes(range(256)) * 40  # 10240 bytes
+        test_file.write_bytes(test_data)
+
+        def reverse_processor(offset: int, chunk: bytes) -> bytes:
+            return chunk[::-1]
+
+        results = list(
+            parallel_chunk_processor(
+                test_file,
+                reverse_processor,
+                chunk_size=1000,
+                max_workers=4,
+                max_inflight=3,
+            )
+        )
+
+        assert [offset for offset, _ in results] == list(range(0, 10240, 1000))
+        for offset, processed_chunk in results:
+            assert processed_chunk == test_data[offset : offset + 1000][::-1]
+
     def test_memory_efficiency(self) -> None:
         """Test that streaming operations don't load entire file into memory."""
         # Create a large file
@@ -438,6 +621,9 @@ class TestStreamHelpers:
         with pytest.raises(FileNotFoundError):
             list(editor.read_chunks())
 
+        with pytest.raises(FileNotFoundError):
+            list(editor.read_chunks_prefetched())
+
         with pytest.raises(FileNotFoundError):
             list(editor.read_lines())
 